@@ -1,10 +1,16 @@
 import os
-import json
+import re
+import asyncio
+import orjson
 from mcp.server.fastmcp import FastMCP
 import aiosqlite
 from dotenv import load_dotenv
 import logging
 import sys
+import stat
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
 
 # --- Logging Setup ---
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
@@ -13,6 +19,9 @@ logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
 logger = logging.getLogger(__name__)
+# The log level is fixed at startup, so the tools check this flag instead of
+# going through the logging machinery for debug messages on every call.
+_DEBUG = logger.isEnabledFor(logging.DEBUG)
 
 # --- Database Path and Validation ---
 def check_db_path(path: str):
@@ -21,20 +30,31 @@ def check_db_path(path: str):
     - Checks if the path exists and is a file.
     - Checks if the file is a valid SQLite3 database by reading its header.
     """
-    if not os.path.isfile(path):
+    # Open once and check the open descriptor instead of stat-ing the path
+    # separately. O_NONBLOCK keeps a FIFO or device from blocking the open.
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+    except FileNotFoundError:
         logger.critical(f"Database path does not point to a file: {path}")
         sys.exit(1)
-
-    # Check for SQLite magic number
+    except OSError as e:
+        logger.critical(f"Cannot read database file at {path}: {e}")
+        sys.exit(1)
     try:
-        with open(path, 'rb') as f:
-            header = f.read(16)
-        if header != b'SQLite format 3\x00':
-            logger.critical(f"File is not a valid SQLite3 database: {path}")
+        if not stat.S_ISREG(os.fstat(fd).st_mode):
+            logger.critical(f"Database path does not point to a file: {path}")
             sys.exit(1)
-    except IOError as e:
+        header = os.pread(fd, 16, 0)
+    except OSError as e:
         logger.critical(f"Cannot read database file at {path}: {e}")
         sys.exit(1)
+    finally:
+        os.close(fd)
+
+    # Check for SQLite magic number
+    if header != b'SQLite format 3\x00':
+        logger.critical(f"File is not a valid SQLite3 database: {path}")
+        sys.exit(1)
     logger.info("Database file validation successful.")
 
 # loading variable from .env file
@@ -51,10 +71,124 @@ check_db_path(DB_PATH)
 # Initialize the FastMCP server. This is the heart of our MCP application.
 mcp = FastMCP("python-sqlite-server")
 
-# Get database path from environment variable, with a fallback for local testing
+# --- Database Connection Pool ---
+# A pool of connections is opened on first use and shared by every tool call,
+# instead of paying for a new connection (and its worker thread) per request.
+# Each aiosqlite connection runs its statements on its own thread, so several
+# connections let concurrent queries run in parallel instead of queueing up.
+_pool_size = os.environ.get("DB_POOL_SIZE") or str(min(os.cpu_count() or 1, 8))
+# An empty pool would make every tool call wait forever for a connection
+if not _pool_size.isdigit() or int(_pool_size) < 1:
+    logger.critical(f"DB_POOL_SIZE must be a positive integer, got: {_pool_size}")
+    sys.exit(1)
+DB_POOL_SIZE = int(_pool_size)
+_pool: asyncio.Queue[aiosqlite.Connection] | None = None
+_connections: list[aiosqlite.Connection] = []
+_pool_lock = asyncio.Lock()
+
+# The tools only ever read, so the file is opened read-only; readers only take
+# shared locks and don't block each other.
+# With DB_IMMUTABLE=1 it is also opened immutable, which skips all locking and
+# change detection. Only use that when nothing writes to the file while the
+# server runs: if an immutable database changes underneath SQLite, queries can
+# return wrong results or fail with SQLITE_CORRUPT.
+DB_IMMUTABLE = os.environ.get("DB_IMMUTABLE", "0") == "1"
+DB_URI = f"{Path(DB_PATH).absolute().as_uri()}?mode=ro"
+if DB_IMMUTABLE:
+    DB_URI += "&immutable=1"
+# Applied once to every new connection. The page cache is per connection, so
+# worst-case cache memory is DB_POOL_SIZE x 64 MB (512 MB at the default cap).
+DB_PRAGMAS = (
+    "PRAGMA query_only=1",
+    "PRAGMA mmap_size=268435456",  # 256 MB, serve reads from the page cache
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",  # 64 MB
+)
+
+async def open_db() -> aiosqlite.Connection:
+    """
+    Opens a new read-only connection with the pool's settings applied.
+    """
+    db = aiosqlite.connect(DB_URI, uri=True)
+    # Don't let the connection's worker thread keep the process alive
+    db.daemon = True
+    await db
+    for pragma in DB_PRAGMAS:
+        await db.execute(pragma)
+    return db
+
+async def get_pool() -> asyncio.Queue[aiosqlite.Connection]:
+    """
+    Returns the connection pool, opening its connections on first use.
+    """
+    global _pool
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                pool = asyncio.Queue()
+                try:
+                    for _ in range(DB_POOL_SIZE):
+                        db = await open_db()
+                        _connections.append(db)
+                        pool.put_nowait(db)
+                except BaseException:
+                    # Don't leave half a pool's worth of connections behind
+                    while _connections:
+                        await _connections.pop().close()
+                    raise
+                _pool = pool
+                logger.info("Opened %d database connection(s).", DB_POOL_SIZE)
+    return _pool
+
+@asynccontextmanager
+async def acquire_db() -> AsyncIterator[aiosqlite.Connection]:
+    """
+    Borrows a connection from the pool for the duration of the block.
+    """
+    pool = await get_pool()
+    db = await pool.get()
+    try:
+        yield db
+    finally:
+        pool.put_nowait(db)
+
+async def close_db():
+    """
+    Closes all pooled database connections, if they were opened.
+    """
+    global _pool, _tables_cache
+    if _pool is not None:
+        _pool = None
+        _tables_cache = None
+        while _connections:
+            await _connections.pop().close()
+        logger.info("Closed database connections.")
 
 # --- MCP Tools for Database Interaction ---
 
+# Number of rows fetched and encoded at a time by execute_query
+FETCH_BATCH_SIZE = 1000
+# Matches queries starting with SELECT; only the leading characters are scanned
+_SELECT_RE = re.compile(r"\s*select\b", re.IGNORECASE)
+
+# With DB_IMMUTABLE=1 the file is promised not to change, so its table list is
+# fixed while the pool is open; list_tables computes it once and close_db
+# resets it. Otherwise the schema can change underneath us and is always read.
+_tables_cache: str | None = None
+_tables_lock = asyncio.Lock()
+
+async def _query_tables() -> str:
+    """
+    Reads the table names from the database as a JSON string.
+    """
+    async with acquire_db() as db:
+        cursor = await db.execute("SELECT name FROM sqlite_master WHERE type='table';")
+        try:
+            tables = [row[0] for row in await cursor.fetchall()]
+        finally:
+            await cursor.close()
+    return orjson.dumps(tables).decode()
+
 @mcp.tool()
 async def execute_query(query: str) -> str:
     """
@@ -63,19 +197,31 @@ async def execute_query(query: str) -> str:
     Args:
         query: The SQL SELECT statement to execute.
     Returns:
-        A JSON string of the query result.
+        A JSON string of the query result. JSON has no NaN or Infinity, so
+        non-finite REAL values (NaN, Infinity, -Infinity) are returned as null.
     """
-    logger.debug("Received query: %s", query)
-    if not query.lstrip().upper().startswith("SELECT"):
+    if _DEBUG:
+        logger.debug("Received query: %s", query)
+    if not _SELECT_RE.match(query):
         logger.warning("Blocked non-SELECT query: %s", query)
         return "Error: Only SELECT queries are allowed for security reasons."
     try:
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with acquire_db() as db:
             cursor = await db.execute(query)
-            rows = await cursor.fetchall()
-            columns = [description[0] for description in cursor.description]
-            result = [dict(zip(columns, row)) for row in rows]
-            return json.dumps(result)
+            try:
+                columns = [description[0] for description in cursor.description]
+                # Encode the result one batch at a time, so only a single batch of
+                # rows is held as Python objects instead of the whole result set
+                result = bytearray(b"[")
+                while rows := await cursor.fetchmany(FETCH_BATCH_SIZE):
+                    if len(result) > 1:
+                        result += b","
+                    batch = orjson.dumps([dict(zip(columns, row)) for row in rows])
+                    result += memoryview(batch)[1:-1]
+                result += b"]"
+            finally:
+                await cursor.close()
+        return result.decode()
     except Exception as e:
         logger.error("Error executing query: %s", e, exc_info=True)
         return f"Error executing query: {e}"
@@ -87,15 +233,22 @@ async def list_tables() -> str:
     Returns:
         A JSON string of the table names.
     """
-    logger.debug("Request to list tables")
+    global _tables_cache
+    if _DEBUG:
+        logger.debug("Request to list tables")
+    if _tables_cache is not None:
+        return _tables_cache
     try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            cursor = await db.execute("SELECT name FROM sqlite_master WHERE type='table';")
-            tables = [row[0] for row in await cursor.fetchall()]
-            return json.dumps(tables)
+        if not DB_IMMUTABLE:
+            return await _query_tables()
+        async with _tables_lock:
+            if _tables_cache is None:
+                _tables_cache = await _query_tables()
+            return _tables_cache
     except Exception as e:
         logger.error("Error listing tables: %s", e, exc_info=True)
         return f"Error listing tables: {e}"
 
 # Use FastMCP's built-in SSE app directly
 app = mcp.sse_app()
+app.add_event_handler("shutdown", close_db)
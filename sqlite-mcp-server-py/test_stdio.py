@@ -4,8 +4,12 @@ Test the MCP server tools using stdio transport (simpler than SSE)
 """
 import os
 import asyncio
-import json
-from app.main import mcp
+import orjson
+from app.main import mcp, FETCH_BATCH_SIZE
+
+def result_text(result) -> str:
+    """Extract the text of a tool result (FastMCP returns a list of content items)"""
+    return result[0].text
 
 async def test_tools():
     """Test the MCP tools directly"""
@@ -25,15 +29,39 @@ async def test_tools():
         tables_result = await mcp.call_tool("list_tables", {})
         print(f"✅ list_tables result: {tables_result}")
         
-        # Extract text from MCP response
-        if hasattr(tables_result, 'content') and tables_result.content:
-            tables_text = tables_result.content[0].text
-        else:
-            tables_text = str(tables_result)
-        
-        tables = json.loads(tables_text)
+        tables_text = result_text(tables_result)
+        tables = orjson.loads(tables_text)
         print(f"✅ Found tables: {tables}")
         
+        # A repeated call (served from the cache with DB_IMMUTABLE=1) returns the same tables
+        second_text = result_text(await mcp.call_tool("list_tables", {}))
+        if second_text != tables_text:
+            print(f"❌ Second list_tables call returned: {second_text}")
+            return False
+        print("✅ Second list_tables call returned the same tables")
+        
+        # A result spanning several fetch batches comes back complete and in order
+        row_count = FETCH_BATCH_SIZE * 2 + 1
+        query_text = result_text(await mcp.call_tool("execute_query", {
+            "query": "SELECT i FROM (WITH RECURSIVE n(i) AS "
+                     f"(SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < {row_count}) "
+                     "SELECT i FROM n)"
+        }))
+        data = orjson.loads(query_text)
+        if data != [{"i": i} for i in range(1, row_count + 1)]:
+            print(f"❌ Batched query returned {len(data)} row(s), expected {row_count}")
+            return False
+        print(f"✅ Batched query returned all {row_count} rows")
+        
+        # An empty result is an empty JSON array
+        query_text = result_text(await mcp.call_tool("execute_query", {
+            "query": "SELECT 1 AS x WHERE 0"
+        }))
+        if orjson.loads(query_text) != []:
+            print(f"❌ Empty query returned: {query_text}")
+            return False
+        print("✅ Empty query returned []")
+        
         if tables:
             # Test execute_query
             query_result = await mcp.call_tool("execute_query", {
@@ -41,13 +69,8 @@ async def test_tools():
             })
             print(f"✅ query result: {query_result}")
             
-            # Extract text from MCP response
-            if hasattr(query_result, 'content') and query_result.content:
-                query_text = query_result.content[0].text
-            else:
-                query_text = str(query_result)
-            
-            data = json.loads(query_text)
+            query_text = result_text(query_result)
+            data = orjson.loads(query_text)
             print(f"✅ Retrieved {len(data)} row(s) from database")
             print(f"✅ Sample data: {data[0] if data else 'No data'}")
             return True